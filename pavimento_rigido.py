@@ -1,697 +1,1081 @@
-import streamlit as st
-import numpy as np
-from scipy.optimize import fsolve
-from scipy.stats import norm
-import pandas as pd
-
-# --- CONFIGURACIÓN DE PÁGINA ---
-st.set_page_config(page_title="Diseño Pavimento Rigido - Subestaciones - AASHTO '93", page_icon="🏗️", layout="wide")
-
-# --- FUNCIONES TÉCNICAS ---
-def calcular_w18(tpd, periodo, crecimiento, peso_eje):
-    p_patron = 8.2  # Ton (18 kips)
-    alfa = 4.0
-    fe = (peso_eje / p_patron)**alfa
-    r = crecimiento / 100
-    f_crec = periodo * 365 if r == 0 else ((1 + r)**periodo - 1) / r * 365
-    return fe, tpd * fe * f_crec
-    
-def calcular_k_combinado(k_subrasante, espesor_base_cm, tipo_material):
-    """
-    Estima el k combinado (Losa sobre base) según AASHTO/PCA.
-    k_subrasante: pci
-    espesor_base_cm: cm
-    tipo_material: 'Granular' o 'Tratada con Cemento'
-    """
-    # Conversión a pulgadas para fórmulas empíricas
-    h_pulg = espesor_base_cm / 2.54
-    
-    # Límites lógicos para evitar valores irreales en la extrapolación
-    if h_pulg < 3: return k_subrasante # Menos de 7.5cm no aporta mucho estructuralmente
-    
-    if tipo_material == "Base Granular (Zahorra)":
-        # Aproximación logarítmica del ábaco de bases granulares
-        # Incremento moderado
-        factor = 1 + (0.15 * np.log(h_pulg))
-        k_nuevo = k_subrasante * factor
-        
-    elif tipo_material == "Suelo Cemento / Estabilizada":
-        # Aproximación para bases tratadas (aumentan mucho la rigidez)
-        # El incremento es mucho más agresivo
-        factor = 1 + (0.35 * np.log(h_pulg))
-        
-        # Las bases tratadas suelen tener un 'tope' efectivo de aporte a la losa
-        k_nuevo = k_subrasante * factor * 1.25 
-        
-    else:
-        k_nuevo = k_subrasante
-
-    # Tope máximo recomendado (valores k > 500-600 pci actúan como losa rígida)
-    return min(k_nuevo, 800.0)
-    
-def calcular_espesor_aashto(w18, zr, s0, p0, pt, sc, cd, j, ec, k):
-    d_psi = p0 - pt
-    def ecuacion(D):
-        if D <= 0: return 1e10
-        term_conf = zr * s0
-        term_esp = 7.35 * np.log10(D + 1) - 0.06
-        term_serv = np.log10(max(d_psi, 0.01) / 3.0) / (1 + (1.624 * 10**7) / ((D + 1)**8.46))
-        factor_ajuste = 4.22 - 0.32 * pt
-        num = sc * cd * (D**0.75 - 1.132)
-        den = 215.63 * j * (D**0.75 - (18.42 / ((ec / k)**0.25)))
-        if num / den <= 0: return 1e10
-        term_mat = factor_ajuste * np.log10(num / den)
-        return (term_conf + term_esp + term_serv + term_mat) - np.log10(max(w18, 1))
-    
-    for guess in [6, 8, 10, 12, 14, 18]:
-        sol, _, ier, _ = fsolve(ecuacion, guess, full_output=True)
-        if ier == 1 and sol[0] > 0: return sol[0]
-    return None
-
-# --- INTERFAZ ---
-st.title("🏗️ Diseñador Pavimento Rigido - Subestaciones")
-
-# Visualización de todas las fórmulas de diseño
-with st.expander("📝 Ecuaciones de Diseño (AASHTO 93 & Correlaciones)"):
-    st.markdown("**1. Ecuación Estructural AASHTO 93 (Rígido):**")
-    st.latex(r" \log_{10}(W_{18}) = Z_R S_0 + 7.35 \log_{10}(D + 1) - 0.06 + \frac{\log_{10}[\Delta PSI / (4.5 - 1.5)]}{1 + \frac{1.624 \times 10^7}{(D + 1)^{8.46}}} + (4.22 - 0.32p_t) \log_{10} \left[ \frac{S'_c C_d (D^{0.75} - 1.132)}{215.63 J \left( D^{0.75} - \frac{18.42}{(E_c/k)^{0.25}} \right)} \right] ")
-    
-    st.markdown("**2. Correlación de Módulo de Reacción (k) vs CBR:**")
-    st.latex(r" \text{Si } CBR \leq 10\%: \quad k = 25.5 + 52.5 \log_{10}(CBR) ")
-    st.latex(r" \text{Si } CBR > 10\%: \quad k = 46.0 + 9.08 (\log_{10}(CBR))^{4.34} ")
-
-tab1, tab2, tab3, tab4 = st.tabs(["🚛 Tránsito y Carga", "🧱 Parámetros de Diseño", "📐 Geometría y Juntas", "📊 Ábaco"])
-
-with tab1:
-    st.header("Análisis de Tránsito (Eje Crítico)")
-    c1, c2 = st.columns(2)
-    with c1:
-        tpd = st.number_input("TPD (Vehículos pesados/día)", min_value=1, value=5, step=1)
-        periodo = st.number_input("Periodo de diseño (años)", min_value=1, value=25, step=1)
-        tasa = st.number_input("Tasa de crecimiento (%)", min_value=0.0, value=0.0, step=0.1)
-    with c2:
-        peso_eje = st.number_input("Peso eje más pesado (Ton)", min_value=1.0, value=11.0, step=0.5)
-        st.caption("ℹ️ El daño se calcula basándose en un **eje patrón de 8.2 Ton** (18 kips).")
-    
-    fe, w18_total = calcular_w18(tpd, periodo, tasa, peso_eje)
-    st.metric("W18 Acumulado (ESALs)", f"{w18_total:,.0f}")
-    
-    if w18_total < 200000:
-        st.warning("⚠️ **Nota Técnica:** El tránsito acumulado es bajo para el rango de aplicación original de AASHTO 93. El espesor obtenido está gobernado por criterios mínimos constructivos.")
-
-with tab2:
-    st.header("Configuración AASHTO '93")
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.subheader("🛡️ Confiabilidad y Desviación")
-        tipo_infra = st.selectbox("Clasificación de la Vía / Infraestructura:", 
-                                ["Subestación Extra Alta Tensión (230-500 kV)", 
-                                 "Subestación Alta Tensión (66-115 kV)", 
-                                 "Autopistas y Vías Expresas", "Arterias Principales", "Colectoras", "Locales / Industriales"])
-        
-        map_conf = {
-            "Subestación Extra Alta Tensión (230-500 kV)": 95, "Subestación Alta Tensión (66-115 kV)": 85,
-            "Autopistas y Vías Expresas": 90, "Arterias Principales": 85, "Colectoras": 75, "Locales / Industriales": 55
-        }
-        
-        conf = st.select_slider("Confiabilidad R (%)", [50, 55, 60, 65, 70, 75, 80, 85, 90, 95, 99], value=map_conf.get(tipo_infra, 95))
-        zr = norm.ppf(1 - (conf / 100))
-        st.info(f"**Confiabilidad adoptada:** {conf}% (Zr = {zr:.3f})")
-        
-        s0_opt = st.selectbox("Guía para S0 (Desviación Estándar):", 
-                             ["Construcción Rígida Estándar (0.35)", "Mayor incertidumbre (0.39)", "Personalizado"])
-        s0 = st.number_input("Valor S0", 0.30, 0.45, 0.35) if s0_opt == "Personalizado" else (0.35 if "0.35" in s0_opt else 0.39)
-
-        p0 = st.slider("Serviciabilidad Inicial (P0)", 4.0, 5.0, 4.5)
-        pt = st.slider("Serviciabilidad Final (Pt)", 2.0, 3.0, 2.5)
-
-        st.subheader("🧱 Propiedades del Concreto")
-        # 1. Definición del Factor k (Correlación para S'c)
-        k_modo = st.radio("Definición del factor k (S'c = k * √f'c):", 
-                          ["Valores Recomendados (Memoria)", "Ingreso Manual"], horizontal=True)
-        
-        if k_modo == "Valores Recomendados (Memoria)":
-            tipo_pav = st.selectbox("Tipo de Pavimento:", 
-                                     ["Autopistas/Carreteras (k=10.8)", 
-                                      "Zonas Industriales (k=10.1)", 
-                                      "Urbanos Secundarios (k=9.4)",
-                                      "Subestaciones / Estándar (k=8.0)"])
-            
-            map_k = {
-                "Autopistas/Carreteras (k=10.8)": 10.8, 
-                "Zonas Industriales (k=10.1)": 10.1,
-                "Urbanos Secundarios (k=9.4)": 9.4,
-                "Subestaciones / Estándar (k=8.0)": 8.0
-            }
-            k_final = map_k[tipo_pav]
-        else:
-            k_final = st.number_input("Ingrese valor de k personalizado:", 7.0, 12.0, 8.0, step=0.1)
-        # 2. Resistencia a la Compresión
-        fc_kg = st.selectbox("Resistencia f'c (kg/cm²)", [210, 245, 280, 315, 350], index=2)
-        fc_psi = fc_kg * 14.2233
-        # 3. Cálculos Finales
-        sc = k_final * np.sqrt(fc_psi)
-        ec = 57000 * np.sqrt(fc_psi)
-        # 4. Visualización de Resultados
-        st.success(f"**Módulo de Ruptura (S'c):** {sc:.2f} psi")
-        st.info(f"**Módulo de Elasticidad (Ec):** {ec:,.0f} psi")
-        
-        st.markdown(f"""
-        <div style="background-color: #f0f2f6; padding: 10px; border-radius: 5px;">
-            <small><b>Fórmulas aplicadas:</b><br>
-            S'c = {k_final} × √f'c (psi)<br>
-            Ec = 57000 × √f'c (psi)</small>
-        </div>
-        """, unsafe_allow_html=True)
-    with col2:
-        st.subheader("🌍 Soporte del Suelo (Sistema Multicapa)")
-        
-        # --- SECCIÓN 1: SUELO NATURAL ---
-        st.markdown("#### 1. Subrasante Natural")
-        
-        # Selector de método para k
-        metodo_k = st.radio(
-            "Método para definir k natural:",
-            ["Correlación AASHTO (CBR)", "Ensayo de Placa de Carga (Manual)"],
-            horizontal=True
-        )
-        
-        if metodo_k == "Correlación AASHTO (CBR)":
-            cbr = st.number_input("CBR de la Subrasante (%)", 1.0, 100.0, 3.0, step=0.5, help="Valor de soporte del suelo natural")
-            
-            # Fórmulas de correlación técnica
-            if cbr <= 10:
-                k_natural = 25.5 + 52.5 * np.log10(cbr)
-            else:
-                k_natural = 46.0 + 9.08 * (np.log10(cbr))**4.34
-            
-            st.caption(f"Valor k natural calculado: **{k_natural:.1f} pci**")
-            
-            # --- NOTAS RECUPERADAS ---
-            st.warning("⚠️ **Aviso Técnico:** La correlación CBR–k es una aproximación teórica. Se recomienda validar con **placa de carga**.")
-            
-            with st.expander("📝 Ver justificación metodológica"):
-                st.info("""
-                **Criterio de Diseño:** Se utiliza la correlación matemática CBR–k expresada en pci para mantener la coherencia con el modelo empírico de la AASHTO '93. 
-                
-                Gráficos referenciales (como la Fig. 1 de la norma) suelen sobreestimar la capacidad de soporte en subrasantes naturales al no considerar el confinamiento real de la losa. Para un diseño estructural seguro, se prioriza la consistencia con el *AASHTO Road Test*.
-                """)
-            # --------------------------
-        
-        else:
-            # Opción manual (Ensayo de Placa)
-            col_k1, col_k2 = st.columns(2)
-            with col_k1:
-                k_manual_mpa = st.number_input("k del Ensayo (MPa/m)", 10.0, 150.0, 40.0)
-            with col_k2:
-                k_natural = k_manual_mpa * 3.684
-                st.metric("k Natural (pci)", f"{k_natural:.1f}")
-            
-            st.success("✅ Usando valor real de ensayo de placa.")
-
-        # --- SECCIÓN 2: MEJORAMIENTO / SUB-BASE ---
-        st.divider()
-        st.markdown("#### 2. Mejoramiento / Sub-base")
-        st.caption("El uso de una base incrementa el valor de reacción (k combinado).")
-        
-        usar_base = st.checkbox("¿Incluir capa de Base/Mejoramiento?", value=True)
-        
-        if usar_base:
-            c_b1, c_b2 = st.columns(2)
-            with c_b1:
-                tipo_base = st.selectbox("Material de Base:", ["Base Granular (Zahorra)", "Suelo Cemento / Estabilizada"])
-            with c_b2:
-                esp_base = st.number_input("Espesor Base (cm):", 10.0, 60.0, 15.0, step=5.0)
-            
-            # Calculamos el k combinado usando la función nueva
-            k_diseno = calcular_k_combinado(k_natural, esp_base, tipo_base)
-            
-            # Cálculo del porcentaje de mejora para mostrarlo visualmente
-            mejora_pct = ((k_diseno - k_natural) / k_natural) * 100
-            
-            st.metric("Módulo k Combinado (Diseño)", f"{k_diseno:.1f} pci", delta=f"+{mejora_pct:.0f}% Incremento")
-            
-            if tipo_base == "Suelo Cemento / Estabilizada" and esp_base < 15:
-                st.warning("⚠️ Recomendación: Para bases estabilizadas use espesores ≥ 15 cm.")
-                
-        else:
-            # Si no hay base, el k de diseño es el natural
-            k_diseno = k_natural
-            st.metric("Módulo k de Diseño", f"{k_diseno:.1f} pci")
-            st.info("Diseño directo sobre subrasante natural (No recomendado para cargas altas).")
-
-        # Asignamos la variable final 'k_val' que usa el resto del programa
-        k_val = k_diseno
-        st.subheader("🔗 Transferencia de Carga (J)")
-        
-        j_manual = st.toggle("Ingresar J manualmente", False)
-
-        if j_manual:
-            j_val = st.number_input("Valor J personalizado", 2.0, 5.0, 3.2, step=0.1)
-            st.info(f"Valor J manual activo: **{j_val}**")
-            tiene_dovelas = "No"  # Valor por defecto seguro
-            tiene_soporte = "No"  # Valor por defecto seguro
-        else:
-            escenarios_j = {
-                "Escenario 1: Con Dovelas y con Bermas/Bordillo (J: 2.7)": {
-                    "valor": 2.7,
-                    "sustento": "Es el escenario ideal. Las dovelas (pasajuntas) transfieren hasta el 50% de la carga. Las bermas o bordillos integrales evitan que el neumático circule por el borde libre, reduciendo el agrietamiento.",
-                    "nota_bordillo": True,
-                    "dovelas": "Sí",
-                    "soporte": "Sí"
-                },
-                "Escenario 2: Con Dovelas y Sin Bermas/Bordillo (J: 3.2)": {
-                    "valor": 3.2,
-                    "sustento": "Valor estándar AASHTO '93. Excelente transferencia de carga por dovelas, pero sin soporte lateral. Las cargas en el borde generan mayores tensiones.",
-                    "nota_bordillo": False,
-                    "dovelas": "Sí",
-                    "soporte": "No"
-                },
-                "Escenario 3: Sin Dovelas pero Con Bordillo/Berma (J: 3.8)": {
-                    "valor": 3.8,
-                    "sustento": "Transferencia por trabazón de agregados (interlock). El bordillo/berma ayuda a que el esfuerzo en el borde no sea crítico.",
-                    "nota_bordillo": True,
-                    "dovelas": "No",
-                    "soporte": "Sí"
-                },
-                "Escenario 4: Sin Dovelas y Sin Bermas (J: 4.2)": {
-                    "valor": 4.2,
-                    "sustento": "Caso crítico. Sin dovelas la junta es propensa al escalonamiento y sin bermas el camión circula por el borde libre sin apoyo lateral.",
-                    "nota_bordillo": False,
-                    "dovelas": "No",
-                    "soporte": "No"
-                }
-            }
-
-            seleccion = st.radio("Seleccione escenario:", list(escenarios_j.keys()))
-            datos_esc = escenarios_j[seleccion]
-            j_val = datos_esc["valor"]
-            # --- CORRECCIÓN: Definir las variables aquí ---
-            tiene_dovelas = datos_esc["dovelas"]
-            tiene_soporte = datos_esc["soporte"]
-            st.write(f"**Sustento:** {datos_esc['sustento']}")
-
-            if datos_esc["nota_bordillo"]:
-                st.warning("⚠️ **Nota sobre el Bordillo:** Para ser efectivo, debe ser integral (vaciado monolítico) o anclado con barras de amarre. Si es sobrepuesto, no aporta soporte lateral.")
-
-            st.info(f"Valor J: **{j_val}**")
-
-        st.subheader("💧 Coeficiente de Drenaje (Cd)")
-        
-        st.markdown("Responda las siguientes preguntas para estimar el valor Cd:")
-        
-        col_d1, col_d2 = st.columns(2)
-        
-        with col_d1:
-            st.markdown("**1. Velocidad de Drenaje:**")
-            st.caption("Si el pavimento se inunda, ¿qué tan rápido desaparece el agua?")
-            calidad_input = st.selectbox("Seleccione velocidad:", [
-                "Excelente (2 horas)",
-                "Bueno (1 día)",
-                "Regular (1 semana)",
-                "Pobre (1 mes)",
-                "Muy Pobre (Nunca)"
-            ])
-            
-            # Convertimos texto a índice (0 a 4)
-            mapa_calidad = {
-                "Excelente (2 horas)": 0,
-                "Bueno (1 día)": 1,
-                "Regular (1 semana)": 2,
-                "Pobre (1 mes)": 3,
-                "Muy Pobre (Nunca)": 4
-            }
-            idx_calidad = mapa_calidad[calidad_input]
-
-        with col_d2:
-            st.markdown("**2. Clima y Saturación:**")
-            st.caption("¿Con qué frecuencia llueve o el suelo está saturado de agua?")
-            exposicion_input = st.selectbox("Seleccione condición climática:", [
-                "Seco / Árido (< 1% del tiempo)",
-                "Moderado / Estándar (1% - 5% del tiempo)",
-                "Húmedo / Lluvioso (5% - 25% del tiempo)",
-                "Saturación Constante (> 25% del tiempo)"
-            ])
-            
-            # Convertimos texto a índice (0 a 3)
-            mapa_exposicion = {
-                "Seco / Árido (< 1% del tiempo)": 0,
-                "Moderado / Estándar (1% - 5% del tiempo)": 1,
-                "Húmedo / Lluvioso (5% - 25% del tiempo)": 2,
-                "Saturación Constante (> 25% del tiempo)": 3
-            }
-            idx_exposicion = mapa_exposicion[exposicion_input]
-
-        # Matriz de valores AASHTO (Filas: Calidad, Columnas: Exposición)
-        matriz_cd = [
-            [1.25, 1.20, 1.15, 1.10], # Excelente
-            [1.15, 1.10, 1.00, 1.00], # Bueno
-            [1.05, 1.00, 0.95, 0.80], # Regular
-            [0.95, 0.90, 0.80, 0.70], # Pobre
-            [0.80, 0.75, 0.65, 0.55]  # Muy Pobre
-        ]
-        
-        # Obtenemos el valor recomendado automáticamente
-        cd_recomendado = matriz_cd[idx_calidad][idx_exposicion]
-        
-        st.write("---")
-        # Permitimos que el usuario lo edite si quiere, pero por defecto ponemos el calculado
-        cd_val = st.number_input(f"Valor Cd Recomendado: {cd_recomendado}", 0.50, 1.40, cd_recomendado, step=0.01)
-        
-        # Mensajes de feedback visual
-        if cd_val < 1.0:
-            st.error(f"📉 Drenaje Lento (Cd={cd_val}). El agua atrapada debilitará la base, requiriendo mayor espesor de concreto.")
-        elif cd_val > 1.0:
-            st.success(f"📈 Buen Drenaje (Cd={cd_val}). El agua fluye rápido, permitiendo optimizar el espesor.")
-        else:
-            st.info("Drenaje Estándar (Cd = 1.0).")
-            
-    st.divider()
-    if st.button("🚀 CALCULAR ESTRUCTURA"):
-        esp_pulg = calcular_espesor_aashto(w18_total, zr, s0, p0, pt, sc, cd_val, j_val, ec, k_val)
-        
-        if esp_pulg:
-            esp_exacto_cm = esp_pulg * 2.54
-            esp_comercial_cm = np.ceil(esp_exacto_cm) 
-            esp_final_cm = max(esp_comercial_cm, 15.0)
-            
-            # Guardamos variables en Session State
-            st.session_state['esp_final_cm'] = esp_final_cm
-            st.session_state['esp_pulg_base'] = esp_pulg
-            st.session_state['ec_res'] = ec
-            st.session_state['k_res'] = k_val
-            st.session_state['w18_res'] = w18_total
-            st.session_state['conf_res'] = conf
-            st.session_state['tiene_dovelas'] = tiene_dovelas
-            st.session_state['tiene_soporte'] = tiene_soporte
-            
-            # --- NUEVO: GUARDAR CONFIGURACIÓN DE SUB-BASE ---
-            st.session_state['usar_base'] = usar_base
-            if usar_base:
-                st.session_state['tipo_base_guardado'] = tipo_base
-                st.session_state['esp_base_guardado'] = esp_base
-            else:
-                st.session_state['tipo_base_guardado'] = ""
-                st.session_state['esp_base_guardado'] = 0
-                
-            st.toast("✅ Cálculo realizado y datos guardados correctamente.")
-            st.success(f"### Espesor de Losa Recomendado: {esp_final_cm:.1f} cm")
-            st.info(f"*(Valor exacto AASHTO: {esp_exacto_cm:.2f} cm | k diseño: {k_val:.1f} pci)*")
-
-with tab3:
-    st.header("📐 Recomendaciones Geométricas")
-    
-    # Cambiamos la validación al nuevo nombre de variable
-    if 'esp_final_cm' not in st.session_state:
-        st.info("⚠️ Realice el cálculo en la pestaña 'Parámetros de Diseño' para habilitar esta sección.")
-    else:
-        st.warning("⚠️ **Tránsito Excéntrico:** En subestaciones, el tránsito suele circular cerca del borde. Se recomienda considerar bordes engrosados +25% del espesor en perímetros.")
-        
-        col_g1, col_g2 = st.columns(2)
-        with col_g1:
-            ancho_carril = st.number_input("Ancho total de carril (m)", 2.5, 7.0, 4.5, step=0.1)
-            num_juntas_long = 1 if ancho_carril > 4.5 else 0
-            ancho_losa = ancho_carril / (num_juntas_long + 1)
-            st.metric("Ancho de Losa Efectivo (B)", f"{ancho_losa:.2f} m")
-        
-        with col_g2:
-            # Recuperamos el espesor en pulgadas original para la fórmula del radio de rigidez (l)
-            # La fórmula técnica del radio de rigidez RELATIVA (ℓ) requiere unidades en pulgadas
-            esp_pulg_calculo = st.session_state['esp_pulg_base']
-            nu = 0.15 
-            
-            # Radio de rigidez relativa (ℓ) en pulgadas
-            l_pulg = ((st.session_state['ec_res'] * (esp_pulg_calculo**3)) / (12 * (1 - nu**2) * st.session_state['k_res']))**0.25
-            
-            # Límite de rigidez (21 veces l) convertido a metros
-            limit_rigidez = (21 * l_pulg) * 0.0254
-            
-            # Largo sugerido (L) redondeado a múltiplos de 0.5m
-            largo_sug = round((min(ancho_losa * 1.25, limit_rigidez, 5.0)) * 2) / 2
-            st.metric("Largo Sugerido de Losa (L)", f"{largo_sug} m")
-            st.write("📌 **Corte de juntas:** Aserrado temprano (4–12 h después del vaciado).")
-
-        st.divider()
-        st.subheader("🔍 Verificaciones Técnicas")
-        c_v1, c_v2 = st.columns(2)
-        with c_v1:
-            relacion_lb = largo_sug / ancho_losa
-            st.write(f"**1. Relación de Aspecto (L/B):** {relacion_lb:.2f}")
-            if relacion_lb <= 1.25: st.success("✅ Relación ideal (≤ 1.25).")
-            elif relacion_lb <= 1.5: st.warning("⚠️ Relación aceptable (1.25 - 1.50).")
-            else: st.error("🚨 Relación crítica (> 1.50).")
-
-        with c_v2:
-            st.write(f"**2. Radio de Rigidez Relativa (ℓ):** {l_pulg:.2f} pulg")
-            st.write(f"**3. Espaciamiento Máximo (21ℓ):** {limit_rigidez:.2f} m")
-            if largo_sug <= limit_rigidez: st.success("✅ Cumple límite de rigidez.")
-            else: st.error("🚨 Excede límite de rigidez.")
-
-        st.divider()
-        st.subheader("📝 Resumen de Memoria Técnica")
-        resumen_texto = f"""
-        El pavimento rígido fue diseñado para un tránsito acumulado de {st.session_state['w18_res']:,.0f} ESALs, 
-        con una confiabilidad del {st.session_state['conf_res']}%. 
-        
-        **Espesor Adoptado:** {st.session_state['esp_final_cm']:.1f} cm. 
-        La modulación propuesta ({ancho_losa:.2f} m x {largo_sug:.2f} m) cumple criterios técnicos de rigidez. 
-        """
-        st.info(resumen_texto)
-
-    st.markdown("---")
-    st.markdown("<p style='color: gray; font-size: 0.8em;'>Nota: El ancho de carril define la geometría constructiva; no es una variable de entrada estructural en la ecuación de la metodología AASHTO 93.</p>", unsafe_allow_html=True)
-    st.divider()
-    st.subheader("🔩 Diseño de Acero (Dovelas y Amarre)")
-   
-    if 'esp_final_cm' not in st.session_state:
-        st.info("⚠️ Realice el cálculo en la pestaña 'Parámetros de Diseño' para ver el acero.")
-    else:
-        D = st.session_state['esp_final_cm']
-        
-        # Recuperamos variables del Escenario (Tab 2)
-        st_dovelas = st.session_state.get('tiene_dovelas', "No")
-        st_soporte = st.session_state.get('tiene_soporte', "No")
-        
-        # Recuperamos la Geometría actual calculada arriba en este mismo Tab 3
-        # Si num_juntas_long es 1, significa que hay 2 losas (Junta central).
-        # Si num_juntas_long es 0, es una sola losa ancha.
-        es_doble_losa = (num_juntas_long > 0)
-
-        # ------------------------------------------
-        # 1. CÁLCULO DE PASADORES (DOVELAS)
-        # ------------------------------------------
-        if st_dovelas == "No":
-            dov_info = "🚫 No requiere (Según escenario seleccionado: Sin Dovelas)."
-            dov_check = False
-        else:
-            # Si el escenario TIENE dovelas, calculamos dimensiones
-            dov_check = True
-            if D < 15:
-                dov_info = "Espesor muy bajo (<15cm) para dovelas estándar."
-            elif D < 20:
-                dov_info = "Ø 3/4\" (19mm) | Largo: 40 cm | Separación: 30 cm"
-            elif D < 25:
-                dov_info = "Ø 1\" (25mm) | Largo: 45 cm | Separación: 30 cm"
-            elif D < 30:
-                dov_info = "Ø 1 1/4\" (32mm) | Largo: 50 cm | Separación: 30 cm"
-            else:
-                dov_info = "Ø 1 1/2\" (38mm) | Largo: 50 cm | Separación: 30 cm"
-
-        # ------------------------------------------
-        # 2. CÁLCULO DE BARRAS DE AMARRE
-        # ------------------------------------------
-        # Definimos las especificaciones técnicas según espesor primero
-        if D < 20:
-            specs_amarre = "Ø 1/2\" (12mm) | Largo: 60 cm | Sep: 75 cm"
-        elif D < 25:
-            specs_amarre = "Ø 1/2\" (12mm) | Largo: 70 cm | Sep: 65 cm"
-        else:
-            specs_amarre = "Ø 5/8\" (16mm) | Largo: 80 cm | Sep: 60 cm"
-
-        # Determinamos QUÉ tipo de amarre mostrar según tu lógica
-        lista_amarres = []
-        
-        # A. Amarre entre losas (Longitudinal central)
-        if es_doble_losa:
-            lista_amarres.append("Entre Losas (Central)")
-        
-        # B. Amarre con Bordillo (Borde)
-        if st_soporte == "Sí":
-            lista_amarres.append("Losa-Bordillo (Borde)")
-
-        # Generamos el texto final
-        if not lista_amarres:
-            ama_info = "🚫 No requiere acero de amarre."
-            ama_nota = "Caso: Una sola losa de ancho completo y sin bordillo anclado (Escenario sin soporte)."
-            ama_check = False
-        else:
-            ubicacion = " + ".join(lista_amarres)
-            ama_info = f"**Ubicación:** {ubicacion}\n\n**Acero:** {specs_amarre}"
-            ama_nota = "Barras corrugadas de acero grado 60."
-            ama_check = True
-
-        # ------------------------------------------
-        # VISUALIZACIÓN
-        # ------------------------------------------
-        col_a1, col_a2 = st.columns(2)
-        
-        with col_a1:
-            st.markdown("#### 🚀 Pasadores (Dovelas)")
-            st.caption("Transferencia de carga en juntas transversales")
-            if dov_check:
-                st.success(dov_info)
-            else:
-                st.info(dov_info)
-        
-        with col_a2:
-            st.markdown("#### 🔗 Barras de Amarre")
-            st.caption("Anclaje en juntas longitudinales")
-            if ama_check:
-                st.success(ama_info)
-                st.caption(f"📝 {ama_nota}")
-            else:
-                st.info(f"{ama_info}\n\n*{ama_nota}*")
-with tab4:
-    st.header("📊 Ábaco de Sensibilidad: Espesor vs CBR")
-    
-    st.markdown("""
-    ### ¿Qué es el ábaco de diseño?
-    Permite evaluar la sensibilidad del espesor frente a variaciones del **CBR del suelo natural**.
-    *Nota: Si configuraste una Sub-base en la pestaña anterior, el cálculo considera el aporte estructural de esa capa sobre cada CBR evaluado.*
-    *El límite máximo de diseño recomendado para subestaciones es de **25 cm**.*
-    """)
-
-    if 'w18_res' not in st.session_state:
-        st.info("💡 Por favor, realice el cálculo en la pestaña **'🧱 Parámetros de Diseño'**.")
-    else:
-        with st.container(border=True):
-            c1, c2, c3 = st.columns(3)
-            with c1: cbr_ini = st.number_input("CBR Inicial (%)", 1.0, 50.0, 3.0, key="aba_cbr_ini")
-            with c2: cbr_fin = st.number_input("CBR Final (%)", 5.0, 100.0, 20.0, key="aba_cbr_fin")
-            with c3: cbr_inc = st.number_input("Incremento (%)", 0.5, 5.0, 5.0, key="aba_cbr_inc")
-
-        rango_cbr = np.arange(cbr_ini, cbr_fin + cbr_inc, cbr_inc)
-        datos_abaco = []
-        fuera_de_rango = False
-        alerta_detectada = False
-
-        # Recuperar configuración de la base
-        usa_base_sim = st.session_state.get('usar_base', False)
-        tipo_base_sim = st.session_state.get('tipo_base_guardado', "")
-        esp_base_sim = st.session_state.get('esp_base_guardado', 0)
-
-        for c_val in rango_cbr:
-            # 1. k Natural
-            if c_val <= 10:
-                k_nat_iter = 25.5 + 52.5 * np.log10(c_val)
-            else:
-                k_nat_iter = 46.0 + 9.08 * (np.log10(c_val))**4.34
-            
-            # 2. k Mejorado con Sub-base
-            if usa_base_sim:
-                ki_final = calcular_k_combinado(k_nat_iter, esp_base_sim, tipo_base_sim)
-            else:
-                ki_final = k_nat_iter
-
-            # 3. Espesor
-            esp_pulg = calcular_espesor_aashto(
-                st.session_state['w18_res'], zr, s0, p0, pt, sc, cd_val, j_val, st.session_state['ec_res'], ki_final
-            )
-
-            if esp_pulg:
-                esp_cm = esp_pulg * 2.54
-                k_mpa = ki_final / 3.684 
-                
-                row = {
-                    "CBR Suelo (%)": f"{c_val:.1f}%",
-                    "k Comb. (pci)": round(ki_final, 1),
-                    "Espesor Numérico": round(esp_cm, 2)
-                }
-
-                if esp_cm <= 25.0:
-                    adoptado = max(round(esp_cm, 0), 15.0)
-                    row["Espesor Calc. (cm)"] = round(esp_cm, 2)
-                    row["Espesor Adoptado (cm)"] = adoptado
-                    row["Estado"] = "✅ OK"
-                    if 23.0 <= adoptado <= 25.0:
-                        row["Estado"] = "⚠️ Revisar"
-                        alerta_detectada = True
-                else:
-                    fuera_de_rango = True
-                    row["Espesor Calc. (cm)"] = f"Excede ({round(esp_cm,1)})"
-                    row["Espesor Adoptado (cm)"] = "> 25cm"
-                    row["Estado"] = "🚨 Crítico"
-                
-                datos_abaco.append(row)
-        
-        if datos_abaco:
-            df = pd.DataFrame(datos_abaco)
-            st.subheader("📋 Tabla de Sensibilidad (Considerando Estructura de Base)")
-            st.table(df.drop(columns=["Espesor Numérico"]))
-            
-            # --- NOTAS DE ADVERTENCIA RECUPERADAS ---
-            if alerta_detectada:
-                st.warning("""
-                🚨 **ALERTA DE OPTIMIZACIÓN TÉCNICA (Espesor > 23 cm):**
-                Para espesores superiores a 23-25 cm, la metodología AASHTO indica que el diseño se vuelve poco eficiente. 
-                
-                **Recomendaciones antes de aumentar el espesor:**
-                1. **Mejorar la Sub-base:** En lugar de una losa más gruesa, considere una sub-base tratada con cemento para elevar el valor de 'k'.
-                2. **Revisar Transferencia de Carga:** Verifique si el uso de dovelas de mayor diámetro puede optimizar el coeficiente 'J'.
-                3. **Resistencia del Concreto:** Evalúe subir el f'c a 280 o 315 kg/cm² para mejorar el Módulo de Ruptura (S'c).
-                """)
-            
-            if fuera_de_rango:
-                st.error("⚠️ **LÍMITE EXCEDIDO:** El espesor calculado supera los 25 cm.")
-                st.warning("""
-                **🔍 Recomendaciones de Optimización:**
-                Cuando el espesor calculado resulta tan elevado (ej. > 25 cm), la AASHTO '93 sugiere que el diseño debe optimizarse mediante:
-                
-                1. **Mejorar el Valor k:** No diseñe sobre la subrasante natural. Considere una sub-base granular o estabilizada con cemento para alcanzar valores de k cercanos a 250 pci.
-                2. **Incrementar Resistencia (f'c):** Use un concreto de mayor desempeño (f'c 280 o 315 kg/cm²).
-                3. **Verificar Tránsito:** Revise si el número de repeticiones del eje pesado es realista para una subestación.
-                """)
-
-            st.subheader("📈 Curva de Sensibilidad del Espesor")
-            chart_data = df.set_index("CBR Suelo (%)")[["Espesor Numérico"]]
-            chart_data.columns = ["Espesor Calculado (cm)"]
-            st.line_chart(chart_data)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+import functools
+import math
+from statistics import NormalDist
+
+import streamlit as st
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    # numba es opcional: sin él se usa la ruta scipy, con idéntico resultado
+    numba = None
+
+# --- CONFIGURACIÓN DE PÁGINA ---
+st.set_page_config(page_title="Diseño Pavimento Rigido - Subestaciones - AASHTO '93", page_icon="🏗️", layout="wide")
+
+# Zr precalculado para los 11 niveles de confiabilidad del selector: la
+# inversa de la normal viene de la biblioteca estándar (sin scipy.stats) y se
+# evalúa una sola vez al importar; cada rerun es una consulta de diccionario
+ZR_MAP = {r: round(NormalDist().inv_cdf(1 - r / 100), 3)
+          for r in (50, 55, 60, 65, 70, 75, 80, 85, 90, 95, 99)}
+
+# Aporte estructural de la base al k combinado, por material:
+# (pendiente logarítmica, multiplicador). Materiales desconocidos no aportan.
+MATERIAL_COEF = {
+    "Base Granular (Zahorra)": (0.15, 1.0),
+    "Suelo Cemento / Estabilizada": (0.35, 1.25),
+}
+
+# Estructuras estáticas de tab2: definidas una sola vez a nivel de módulo en
+# lugar de reconstruirse (dicts y matriz completos) en cada rerun del script
+MAPA_CONF = {
+    "Subestación Extra Alta Tensión (230-500 kV)": 95, "Subestación Alta Tensión (66-115 kV)": 85,
+    "Autopistas y Vías Expresas": 90, "Arterias Principales": 85, "Colectoras": 75, "Locales / Industriales": 55
+}
+
+MAPA_K_SC = {
+    "Autopistas/Carreteras (k=10.8)": 10.8, 
+    "Zonas Industriales (k=10.1)": 10.1,
+    "Urbanos Secundarios (k=9.4)": 9.4,
+    "Subestaciones / Estándar (k=8.0)": 8.0
+}
+
+ESCENARIOS_J = {
+    "Escenario 1: Con Dovelas y con Bermas/Bordillo (J: 2.7)": {
+        "valor": 2.7,
+        "sustento": "Es el escenario ideal. Las dovelas (pasajuntas) transfieren hasta el 50% de la carga. Las bermas o bordillos integrales evitan que el neumático circule por el borde libre, reduciendo el agrietamiento.",
+        "nota_bordillo": True,
+        "dovelas": "Sí",
+        "soporte": "Sí"
+    },
+    "Escenario 2: Con Dovelas y Sin Bermas/Bordillo (J: 3.2)": {
+        "valor": 3.2,
+        "sustento": "Valor estándar AASHTO '93. Excelente transferencia de carga por dovelas, pero sin soporte lateral. Las cargas en el borde generan mayores tensiones.",
+        "nota_bordillo": False,
+        "dovelas": "Sí",
+        "soporte": "No"
+    },
+    "Escenario 3: Sin Dovelas pero Con Bordillo/Berma (J: 3.8)": {
+        "valor": 3.8,
+        "sustento": "Transferencia por trabazón de agregados (interlock). El bordillo/berma ayuda a que el esfuerzo en el borde no sea crítico.",
+        "nota_bordillo": True,
+        "dovelas": "No",
+        "soporte": "Sí"
+    },
+    "Escenario 4: Sin Dovelas y Sin Bermas (J: 4.2)": {
+        "valor": 4.2,
+        "sustento": "Caso crítico. Sin dovelas la junta es propensa al escalonamiento y sin bermas el camión circula por el borde libre sin apoyo lateral.",
+        "nota_bordillo": False,
+        "dovelas": "No",
+        "soporte": "No"
+    }
+}
+
+MAPA_CALIDAD_DRENAJE = {
+    "Excelente (2 horas)": 0,
+    "Bueno (1 día)": 1,
+    "Regular (1 semana)": 2,
+    "Pobre (1 mes)": 3,
+    "Muy Pobre (Nunca)": 4
+}
+
+MAPA_EXPOSICION_DRENAJE = {
+    "Seco / Árido (< 1% del tiempo)": 0,
+    "Moderado / Estándar (1% - 5% del tiempo)": 1,
+    "Húmedo / Lluvioso (5% - 25% del tiempo)": 2,
+    "Saturación Constante (> 25% del tiempo)": 3
+}
+
+# Matriz de valores AASHTO (Filas: Calidad, Columnas: Exposición)
+MATRIZ_CD = [
+    [1.25, 1.20, 1.15, 1.10], # Excelente
+    [1.15, 1.10, 1.00, 1.00], # Bueno
+    [1.05, 1.00, 0.95, 0.80], # Regular
+    [0.95, 0.90, 0.80, 0.70], # Pobre
+    [0.80, 0.75, 0.65, 0.55]  # Muy Pobre
+]
+
+# Cadenas LaTeX del expander de ecuaciones: constantes de módulo, los
+# literales largos no se reconstruyen en cada rerun
+LATEX_AASHTO93 = r" \log_{10}(W_{18}) = Z_R S_0 + 7.35 \log_{10}(D + 1) - 0.06 + \frac{\log_{10}[\Delta PSI / (4.5 - 1.5)]}{1 + \frac{1.624 \times 10^7}{(D + 1)^{8.46}}} + (4.22 - 0.32p_t) \log_{10} \left[ \frac{S'_c C_d (D^{0.75} - 1.132)}{215.63 J \left( D^{0.75} - \frac{18.42}{(E_c/k)^{0.25}} \right)} \right] "
+LATEX_K_CBR_BAJO = r" \text{Si } CBR \leq 10\%: \quad k = 25.5 + 52.5 \log_{10}(CBR) "
+LATEX_K_CBR_ALTO = r" \text{Si } CBR > 10\%: \quad k = 46.0 + 9.08 (\log_{10}(CBR))^{4.34} "
+
+# --- FUNCIONES TÉCNICAS ---
+@functools.lru_cache(maxsize=256)
+def k_desde_cbr(cbr):
+    """Correlación AASHTO CBR–k (pci), memoizada por valor de CBR."""
+    if cbr <= 10:
+        return 25.5 + 52.5 * math.log10(cbr)
+    return 46.0 + 9.08 * math.log10(cbr)**4.34
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def calcular_w18(tpd, periodo, crecimiento, peso_eje):
+    p_patron = 8.2  # Ton (18 kips)
+    alfa = 4.0
+    fe = (peso_eje / p_patron)**alfa
+    r = crecimiento / 100
+    f_crec = periodo * 365 if r == 0 else ((1 + r)**periodo - 1) / r * 365
+    return fe, tpd * fe * f_crec
+    
+@st.cache_data(max_entries=256, show_spinner=False)
+def calcular_k_combinado(k_subrasante, espesor_base_cm, tipo_material):
+    """
+    Estima el k combinado (Losa sobre base) según AASHTO/PCA.
+    k_subrasante: pci
+    espesor_base_cm: cm
+    tipo_material: 'Granular' o 'Tratada con Cemento'
+    """
+    # Conversión a pulgadas para fórmulas empíricas
+    h_pulg = espesor_base_cm / 2.54
+    
+    # Límites lógicos para evitar valores irreales en la extrapolación
+    if h_pulg < 3: return k_subrasante # Menos de 7.5cm no aporta mucho estructuralmente
+
+    # Aproximación logarítmica de los ábacos de bases: la tabla de
+    # coeficientes reemplaza el árbol de ramas por material (las tratadas
+    # aumentan la rigidez de forma mucho más agresiva, con tope 1.25) y deja
+    # la expresión lista para recibir arreglos de k en el ábaco.
+    pendiente, mult = MATERIAL_COEF.get(tipo_material, (0.0, 1.0))
+    factor = 1 + pendiente * math.log(h_pulg)
+    k_nuevo = k_subrasante * factor * mult
+
+    # Tope máximo recomendado (valores k > 500-600 pci actúan como losa rígida)
+    # np.minimum en lugar de min() para aceptar arreglos de k (ábaco vectorizado)
+    return np.minimum(k_nuevo, 800.0)
+    
+@st.cache_resource(show_spinner=False)
+def _kernels_numba():
+    """
+    Construye y calienta los kernels numba una sola vez por proceso del
+    servidor. Streamlit re-ejecuta el script completo en cada interacción:
+    definir los kernels a nivel de módulo re-crearía los despachadores y
+    re-pagaría la carga del caché de compilación en cada rerun. Devuelve
+    (newton, barrido) o None si numba no está instalado.
+    """
+    if numba is None:
+        return None
+
+    @numba.njit(cache=True, fastmath=True)
+    def _residual_aashto_jit(D, zr, s0, psi_log, factor_ajuste, sc, cd, j, ek,
+                             log_w18):
+        # Residual AASHTO en un punto: compartido por el Newton y la bisección
+        d1 = D + 1.0
+        d075 = D**0.75
+        g = 1.0 + 1.624e7 / d1**8.46
+        num = sc * cd * (d075 - 1.132)
+        den = 215.63 * j * (d075 - ek)
+        return (zr * s0 + 7.35 * math.log10(d1) - 0.06 + psi_log / g
+                + factor_ajuste * math.log10(num / den) - log_w18)
+
+    @numba.njit(cache=True, fastmath=True)
+    def _newton_aashto_jit(zr, s0, psi_log, factor_ajuste, sc, cd, j, ec, k,
+                           log_w18, d_min, x0):
+        # Newton compilado para la ecuación AASHTO: mismo residual y derivada
+        # que la ruta scipy, pero sin despacho Python en cada iteración. Los
+        # términos max()/log invariantes llegan ya evaluados por el llamador.
+        ln10 = math.log(10.0)
+        ek = 18.42 / (ec / k)**0.25
+        D = x0
+        for _ in range(30):
+            Dc = D if D > d_min else d_min
+            d1 = Dc + 1.0
+            d075 = Dc**0.75
+            d1_846 = d1**8.46
+            g = 1.0 + 1.624e7 / d1_846
+            num = sc * cd * (d075 - 1.132)
+            den = 215.63 * j * (d075 - ek)
+            f = (zr * s0 + 7.35 * math.log10(d1) - 0.06 + psi_log / g
+                 + factor_ajuste * math.log10(num / den) - log_w18)
+            d_serv = psi_log * (8.46 * 1.624e7) / (d1_846 * d1 * g * g)
+            d_pot = 0.75 * d075 / Dc
+            fp = (7.35 / (d1 * ln10) + d_serv
+                  + factor_ajuste / ln10 * (sc * cd * d_pot / num - 215.63 * j * d_pot / den))
+            paso = f / fp
+            D = Dc - paso
+            if abs(paso) < 1e-6:
+                # Solo la rama creciente (f' > 0) contiene la raíz física; la
+                # rama descendente junto a la singularidad del término de
+                # materiales produce espesores espurios más delgados.
+                if fp > 0.0 and D > d_min:
+                    return D
+                break
+
+        # Respaldo con corchete verificado: barriendo hacia abajo desde 60",
+        # el primer punto con f < 0 acota el último cruce -→+ (la raíz
+        # física); la rama espuria junto a la singularidad queda excluida.
+        d_hi = 60.0
+        if _residual_aashto_jit(d_hi, zr, s0, psi_log, factor_ajuste, sc, cd,
+                                j, ek, log_w18) <= 0.0:
+            return math.nan
+        d_lo = -1.0
+        d = d_hi - 1.0
+        while d > d_min:
+            if _residual_aashto_jit(d, zr, s0, psi_log, factor_ajuste, sc, cd,
+                                    j, ek, log_w18) < 0.0:
+                d_lo = d
+                break
+            d_hi = d
+            d -= 1.0
+        if d_lo < 0.0:
+            return math.nan
+        for _ in range(40):
+            m = 0.5 * (d_lo + d_hi)
+            if _residual_aashto_jit(m, zr, s0, psi_log, factor_ajuste, sc, cd,
+                                    j, ek, log_w18) < 0.0:
+                d_lo = m
+            else:
+                d_hi = m
+            if d_hi - d_lo < 1e-4:
+                break
+        return 0.5 * (d_lo + d_hi)
+
+    @numba.njit(cache=True, parallel=True)
+    def _abaco_sweep_jit(k_arr, zr, s0, psi_log, factor_ajuste, sc, cd, j, ec,
+                         log_w18, x0):
+        # Barrido del ábaco completo en un kernel paralelo: cada punto de CBR
+        # es independiente, así que prange los reparte entre núcleos.
+        n = k_arr.size
+        out = np.empty(n)
+        for i in numba.prange(n):
+            k_i = k_arr[i]
+            ek = 18.42 / (ec / k_i)**0.25
+            d_min = max(1.132, ek)**(4.0 / 3.0) + 0.25
+            out[i] = _newton_aashto_jit(zr, s0, psi_log, factor_ajuste, sc, cd,
+                                        j, ec, k_i, log_w18, d_min, x0)
+        return out
+
+    # Calentamiento en el arranque: la compilación no se cobra en el primer clic
+    _newton_aashto_jit(-1.645, 0.35, -0.176, 3.42, 600.0, 1.0, 3.2, 3.6e6, 100.0, 5.0, 1.5, 10.0)
+    _abaco_sweep_jit(np.array([100.0, 150.0]), -1.645, 0.35, -0.176, 3.42, 600.0,
+                     1.0, 3.2, 3.6e6, 5.0, 10.0)
+    return _newton_aashto_jit, _abaco_sweep_jit
+
+@st.cache_data(max_entries=1024, show_spinner=False)
+def _espesor_aashto_cacheado(w18, zr, s0, p0, pt, sc, cd, j, ec, k, _x0_hint=10.0):
+    # Import diferido: scipy no se paga en el arranque de cada sesión
+    from scipy.optimize import brentq, newton
+
+    d_psi = p0 - pt
+    # Por debajo de d_min el término de materiales no está definido (logaritmo
+    # de un cociente no positivo); se evalúa siempre sobre D acotado.
+    d_min = max(1.132, 18.42 / (ec / k)**0.25)**(4.0 / 3.0) + 0.25
+
+    # Invariantes en D: se calculan una sola vez por solución en lugar de en
+    # cada iteración de Newton (movimiento de código invariante de bucle).
+    term_conf = zr * s0
+    factor_ajuste = 4.22 - 0.32 * pt
+    psi_log = math.log10(max(d_psi, 0.01) / 3.0)
+    log_w18 = math.log10(max(w18, 1))
+    ek = 18.42 / (ec / k)**0.25
+    ln10 = math.log(10.0)
+
+    # Ruta compilada si numba está disponible
+    kernels = _kernels_numba()
+    if kernels is not None:
+        newton_jit, _ = kernels
+        sol = newton_jit(zr, s0, psi_log, factor_ajuste, sc, cd, j, ec, k,
+                         log_w18, d_min, _x0_hint)
+        if not math.isnan(sol) and sol > d_min:
+            return sol
+
+    # math.log10 evita el despacho de ufuncs de numpy sobre escalares y
+    # D**0.75 se eleva una sola vez por evaluación.
+    def ecuacion(D):
+        D = max(D, d_min)
+        d1 = D + 1
+        d075 = D**0.75
+        term_esp = 7.35 * math.log10(d1) - 0.06
+        term_serv = psi_log / (1 + (1.624 * 10**7) / d1**8.46)
+        num = sc * cd * (d075 - 1.132)
+        den = 215.63 * j * (d075 - ek)
+        term_mat = factor_ajuste * math.log10(num / den)
+        return (term_conf + term_esp + term_serv + term_mat) - log_w18
+
+    def derivada(D):
+        D = max(D, d_min)
+        d1 = D + 1
+        d075 = D**0.75
+        d1_846 = d1**8.46
+        g = 1 + (1.624 * 10**7) / d1_846
+        d_serv = psi_log * (8.46 * 1.624 * 10**7) / (d1_846 * d1 * g**2)
+        num = sc * cd * (d075 - 1.132)
+        den = 215.63 * j * (d075 - ek)
+        d_pot = 0.75 * d075 / D
+        d_mat = factor_ajuste / ln10 * (sc * cd * d_pot / num - 215.63 * j * d_pot / den)
+        return 7.35 / (d1 * ln10) + d_serv + d_mat
+
+    # Newton con derivada analítica: converge en pocas iteraciones desde D=10
+    # sin las diferencias finitas que usaba fsolve. Solo se acepta la raíz de
+    # la rama creciente (f' > 0): el residual tiene una segunda raíz espuria
+    # en la rama descendente junto a la singularidad del término de materiales.
+    try:
+        sol = newton(ecuacion, _x0_hint, fprime=derivada, tol=1e-4, maxiter=30)
+        if math.isfinite(sol) and sol > d_min and derivada(sol) > 0:
+            return float(sol)
+    except RuntimeError:
+        pass
+
+    # Respaldo: a la derecha del mínimo del residual (f' > 0) la ecuación es
+    # estrictamente creciente, así que basta un único brentq acotado. Unas
+    # pocas sondas localizan el extremo inferior del corchete.
+    d_lo = None
+    for d in (2.0, 3.0, 4.0, 6.0, 8.0, 12.0, 16.0, 24.0, 32.0):
+        if d > d_min and derivada(d) > 0 and ecuacion(d) < 0:
+            d_lo = d
+            break
+
+    if d_lo is None:
+        return None
+    d_hi = 40.0
+    if ecuacion(d_hi) <= 0:
+        # Tránsitos extremos pueden empujar la raíz por encima de 40"
+        d_hi = 60.0
+        if ecuacion(d_hi) <= 0:
+            return None
+    return brentq(ecuacion, d_lo, d_hi, xtol=1e-4)
+
+def calcular_espesor_aashto(w18, zr, s0, p0, pt, sc, cd, j, ec, k, x0_hint=10.0):
+    """
+    Entrada pública del solver de espesores. Cuantiza los argumentos a 6
+    decimales para que entradas que solo difieren en ruido de punto flotante
+    compartan entrada de caché. La semilla (_x0_hint) se excluye de la clave
+    porque el solver solo acepta raíces sobre la rama creciente del residual
+    (f' > 0): toda semilla termina en la misma raíz física y solo cambia
+    cuántas iteraciones cuesta llegar, así que cachear por semilla solo
+    fragmentaría el caché.
+    """
+    return _espesor_aashto_cacheado(
+        round(float(w18), 6), round(float(zr), 6), round(float(s0), 6),
+        round(float(p0), 6), round(float(pt), 6), round(float(sc), 6),
+        round(float(cd), 6), round(float(j), 6), round(float(ec), 6),
+        round(float(k), 6), _x0_hint=x0_hint)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def calcular_espesor_aashto_vec(w18, zr, s0, p0, pt, sc, cd, j, ec, k, _x0_hint=10.0):
+    """
+    Versión vectorizada de calcular_espesor_aashto: resuelve el espesor para
+    todo un arreglo de módulos k en una sola corrida de Newton con derivada
+    analítica (scipy despacha a su Newton vectorizado cuando x0 es un arreglo).
+    Devuelve un arreglo en pulgadas, con np.nan donde no hay convergencia.
+    """
+    from scipy.optimize import newton
+
+    k = np.asarray(k, dtype=float)
+
+    # scipy solo despacha a su Newton vectorizado cuando x0.size > 1; con un
+    # único punto (CBR inicial == final en el ábaco) la ruta escalar devuelve
+    # una tupla de 2 y el desempaquetado de full_output fallaría. Ese caso se
+    # delega al solver escalar, que además comparte su caché.
+    if k.size == 1:
+        sol = calcular_espesor_aashto(w18, zr, s0, p0, pt, sc, cd, j, ec,
+                                      float(k[0]), x0_hint=_x0_hint)
+        return np.array([sol if sol is not None else np.nan])
+
+    d_psi = p0 - pt
+
+    # Invariantes en D (igual que en la ruta escalar): se calculan una sola
+    # vez por barrido en lugar de en cada iteración vectorizada.
+    term_conf = zr * s0
+    factor_ajuste = 4.22 - 0.32 * pt
+    psi_log = math.log10(max(d_psi, 0.01) / 3.0)
+    log_w18 = math.log10(max(w18, 1))
+    ln10 = math.log(10.0)
+
+    # Barrido compilado y en paralelo si numba está disponible. El respaldo
+    # scipy es por punto: los resueltos por el kernel se conservan y solo los
+    # NaN (sin raíz en el corchete compilado) pasan por la ruta vectorizada.
+    sol_jit = None
+    kernels = _kernels_numba()
+    if kernels is not None:
+        _, sweep_jit = kernels
+        sol_jit = sweep_jit(k, zr, s0, psi_log, factor_ajuste, sc, cd, j, ec,
+                            log_w18, _x0_hint)
+        if np.all(np.isfinite(sol_jit) & (sol_jit > 0)):
+            return sol_jit
+
+    # k solo entra a la ecuación a través de ek = 18.42/(Ec/k)^0.25: se
+    # factoriza una vez por barrido y todas las iteraciones lo reutilizan.
+    ek = 18.42 / (ec / k)**0.25
+    # Por debajo de d_min el término de materiales no está definido (logaritmo
+    # de un cociente no positivo); se evalúa siempre sobre D acotado.
+    d_min = np.maximum(1.132, ek)**(4.0 / 3.0) + 0.25
+
+    def residual(D):
+        D = np.maximum(D, d_min)
+        d1 = D + 1
+        d075 = D**0.75
+        term_esp = 7.35 * np.log10(d1) - 0.06
+        term_serv = psi_log / (1 + (1.624 * 10**7) / d1**8.46)
+        num = sc * cd * (d075 - 1.132)
+        den = 215.63 * j * (d075 - ek)
+        term_mat = factor_ajuste * np.log10(num / den)
+        return (term_conf + term_esp + term_serv + term_mat) - log_w18
+
+    def dresidual(D):
+        D = np.maximum(D, d_min)
+        d1 = D + 1
+        d075 = D**0.75
+        d1_846 = d1**8.46
+        g = 1 + (1.624 * 10**7) / d1_846
+        d_serv = psi_log * (8.46 * 1.624 * 10**7) / (d1_846 * d1 * g**2)
+        num = sc * cd * (d075 - 1.132)
+        den = 215.63 * j * (d075 - ek)
+        d_pot = 0.75 * d075 / D
+        d_mat = factor_ajuste / ln10 * (sc * cd * d_pot / num - 215.63 * j * d_pot / den)
+        return 7.35 / (d1 * ln10) + d_serv + d_mat
+
+    # Siembra por malla gruesa: el residual se evalúa por difusión (broadcast)
+    # sobre una malla de D contra todos los k a la vez; cada columna toma su
+    # último cambio de signo (- a +) interpolado linealmente, de modo que el
+    # Newton vectorizado arranca ya pegado a su raíz.
+    d_grid = np.linspace(2.0, 40.0, 32)[:, None]
+    r_grid = residual(d_grid)
+    cruce = (r_grid[:-1] < 0) & (r_grid[1:] >= 0)
+    hay_cruce = cruce.any(axis=0)
+    idx = np.where(hay_cruce,
+                   cruce.shape[0] - 1 - np.argmax(cruce[::-1], axis=0), 0)
+    cols = np.arange(k.size)
+    r_lo = r_grid[idx, cols]
+    r_hi = r_grid[idx + 1, cols]
+    d_lo = d_grid[idx, 0]
+    d_hi = d_grid[idx + 1, 0]
+    denom = np.where(r_hi - r_lo == 0, 1.0, r_hi - r_lo)
+    x0 = np.where(hay_cruce, d_lo - r_lo * (d_hi - d_lo) / denom,
+                  np.full_like(k, _x0_hint))
+    try:
+        sol, convergio, _ = newton(residual, x0, fprime=dresidual, tol=1e-4,
+                                   maxiter=50, full_output=True)
+        resultado = np.where(convergio & (sol > 0), sol, np.nan)
+    except RuntimeError:
+        resultado = np.full_like(k, np.nan)
+    if sol_jit is not None:
+        valido_jit = np.isfinite(sol_jit) & (sol_jit > 0)
+        resultado = np.where(valido_jit, sol_jit, resultado)
+    return resultado
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def construir_abaco(w18, zr, s0, p0, pt, sc, cd, j, ec,
+                    cbr_ini, cbr_fin, cbr_inc, usa_base, tipo_base, esp_base):
+    """
+    Genera la tabla de sensibilidad Espesor vs CBR del ábaco (tab4).
+    Devuelve (tabla, curva, fuera_de_rango, alerta_detectada); al estar
+    cacheada, cambiar de pestaña o tocar widgets ajenos no repite el barrido.
+    """
+    # Import diferido: pandas solo se paga cuando se genera un ábaco
+    import pandas as pd
+
+    # linspace con conteo explícito: arange sobre flotantes puede colar una
+    # fila espuria (y por tanto una solución de más) por redondeo del extremo
+    n_pasos = int(round((cbr_fin - cbr_ini) / cbr_inc)) + 1
+    rango_cbr = np.linspace(cbr_ini, cbr_fin, max(n_pasos, 1))
+
+    # 1. k Natural: correlación CBR–k evaluada sobre todo el rango de una vez
+    log_cbr = np.log10(rango_cbr)
+    k_nat_arr = np.where(rango_cbr <= 10,
+                         25.5 + 52.5 * log_cbr,
+                         46.0 + 9.08 * log_cbr**4.34)
+
+    # 2. k Mejorado con Sub-base (calcular_k_combinado acepta arreglos)
+    if usa_base:
+        k_arr = calcular_k_combinado(k_nat_arr, esp_base, tipo_base)
+    else:
+        k_arr = k_nat_arr
+
+    # Umbral cerrado de exceso: a espesor fijo (límite de 25 cm) la ecuación
+    # AASHTO se despeja en k, así que una sola evaluación clasifica todo el
+    # barrido sin resolver raíces: los puntos con k < k_lim exceden el límite.
+    d_lim = 25.0 / 2.54
+    af = 4.22 - 0.32 * pt
+    log_obj = (math.log10(max(w18, 1)) - zr * s0
+               - (7.35 * math.log10(d_lim + 1) - 0.06)
+               - math.log10(max(p0 - pt, 0.01) / 3.0) / (1 + 1.624e7 / (d_lim + 1)**8.46))
+    num_lim = sc * cd * (d_lim**0.75 - 1.132)
+    ek_req = d_lim**0.75 - num_lim / (215.63 * j * 10**(log_obj / af))
+    k_lim = ec / (18.42 / ek_req)**4 if ek_req > 0 else 0.0
+    excede_previo = k_arr < k_lim
+
+    # 3. Espesores: una sola corrida vectorizada de Newton para todo el rango.
+    # Arranque en caliente: los puntos del barrido están muy correlacionados,
+    # así que la raíz del k mediano sirve de semilla para todo el arreglo.
+    hint = calcular_espesor_aashto(w18, zr, s0, p0, pt, sc, cd, j, ec,
+                                   float(k_arr[k_arr.size // 2]))
+    esp_pulg_arr = calcular_espesor_aashto_vec(w18, zr, s0, p0, pt, sc, cd, j, ec, k_arr,
+                                               _x0_hint=hint if hint else 10.0)
+
+    # 4. Post-proceso por columnas: se filtran los puntos sin convergencia y
+    # el DataFrame se arma una sola vez a partir de arreglos completos.
+    validos = ~np.isnan(esp_pulg_arr)
+    cbr_ok = rango_cbr[validos]
+    k_ok = k_arr[validos]
+    esp_cm_arr = esp_pulg_arr[validos] * 2.54
+
+    if not esp_cm_arr.size:
+        return None, None, False, False
+
+    # Post-proceso vectorizado: redondeos, espesor adoptado y estado se
+    # evalúan como expresiones de arreglo en lugar de N llamadas por fila.
+    adoptado_arr = np.maximum(np.round(esp_cm_arr, 0), 15.0)
+    excede = excede_previo[validos]
+    revisar = ~excede & (adoptado_arr >= 23.0) & (adoptado_arr <= 25.0)
+    fuera_de_rango = bool(excede.any())
+    alerta_detectada = bool(revisar.any())
+
+    col_estado = np.where(excede, "🚨 Crítico",
+                          np.where(revisar, "⚠️ Revisar", "✅ OK"))
+    # Columnas mixtas número/texto: solo las filas que exceden llevan etiqueta
+    col_calc = np.round(esp_cm_arr, 2).astype(object)
+    col_adoptado = adoptado_arr.astype(object)
+    if fuera_de_rango:
+        col_calc[excede] = [f"Excede ({round(esp_cm, 1)})" for esp_cm in esp_cm_arr[excede]]
+        col_adoptado[excede] = "> 25cm"
+
+    # Tabla y curva se arman por separado desde los mismos arreglos: la tabla
+    # nunca carga la columna numérica auxiliar (adiós al df.drop por rerun).
+    etiquetas_cbr = np.char.mod("%.1f%%", cbr_ok)
+    df = pd.DataFrame({
+        "CBR Suelo (%)": etiquetas_cbr,
+        "k Comb. (pci)": np.round(k_ok, 1),
+        "Espesor Calc. (cm)": col_calc,
+        "Espesor Adoptado (cm)": col_adoptado,
+        "Estado": col_estado,
+    })
+    df_graf = pd.DataFrame({"Espesor Calculado (cm)": np.round(esp_cm_arr, 2)},
+                           index=etiquetas_cbr)
+    return df, df_graf, fuera_de_rango, alerta_detectada
+
+# --- INTERFAZ ---
+st.title("🏗️ Diseñador Pavimento Rigido - Subestaciones")
+
+# Visualización de todas las fórmulas de diseño
+with st.expander("📝 Ecuaciones de Diseño (AASHTO 93 & Correlaciones)"):
+    st.markdown("**1. Ecuación Estructural AASHTO 93 (Rígido):**")
+    st.latex(LATEX_AASHTO93)
+    
+    st.markdown("**2. Correlación de Módulo de Reacción (k) vs CBR:**")
+    st.latex(LATEX_K_CBR_BAJO)
+    st.latex(LATEX_K_CBR_ALTO)
+
+tab1, tab2, tab3, tab4 = st.tabs(["🚛 Tránsito y Carga", "🧱 Parámetros de Diseño", "📐 Geometría y Juntas", "📊 Ábaco"])
+
+with tab1:
+    st.header("Análisis de Tránsito (Eje Crítico)")
+    c1, c2 = st.columns(2)
+    with c1:
+        tpd = st.number_input("TPD (Vehículos pesados/día)", min_value=1, value=5, step=1)
+        periodo = st.number_input("Periodo de diseño (años)", min_value=1, value=25, step=1)
+        tasa = st.number_input("Tasa de crecimiento (%)", min_value=0.0, value=0.0, step=0.1)
+    with c2:
+        peso_eje = st.number_input("Peso eje más pesado (Ton)", min_value=1.0, value=11.0, step=0.5)
+        st.caption("ℹ️ El daño se calcula basándose en un **eje patrón de 8.2 Ton** (18 kips).")
+    
+    fe, w18_total = calcular_w18(tpd, periodo, tasa, peso_eje)
+    st.metric("W18 Acumulado (ESALs)", f"{w18_total:,.0f}")
+    
+    if w18_total < 200000:
+        st.warning("⚠️ **Nota Técnica:** El tránsito acumulado es bajo para el rango de aplicación original de AASHTO 93. El espesor obtenido está gobernado por criterios mínimos constructivos.")
+
+with tab2:
+    st.header("Configuración AASHTO '93")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("🛡️ Confiabilidad y Desviación")
+        tipo_infra = st.selectbox("Clasificación de la Vía / Infraestructura:", 
+                                ["Subestación Extra Alta Tensión (230-500 kV)", 
+                                 "Subestación Alta Tensión (66-115 kV)", 
+                                 "Autopistas y Vías Expresas", "Arterias Principales", "Colectoras", "Locales / Industriales"])
+        
+        conf = st.select_slider("Confiabilidad R (%)", [50, 55, 60, 65, 70, 75, 80, 85, 90, 95, 99], value=MAPA_CONF.get(tipo_infra, 95))
+        zr = ZR_MAP[conf]
+        st.info(f"**Confiabilidad adoptada:** {conf}% (Zr = {zr:.3f})")
+        
+        s0_opt = st.selectbox("Guía para S0 (Desviación Estándar):", 
+                             ["Construcción Rígida Estándar (0.35)", "Mayor incertidumbre (0.39)", "Personalizado"])
+        s0 = st.number_input("Valor S0", 0.30, 0.45, 0.35) if s0_opt == "Personalizado" else (0.35 if "0.35" in s0_opt else 0.39)
+
+        p0 = st.slider("Serviciabilidad Inicial (P0)", 4.0, 5.0, 4.5)
+        pt = st.slider("Serviciabilidad Final (Pt)", 2.0, 3.0, 2.5)
+
+        st.subheader("🧱 Propiedades del Concreto")
+        # 1. Definición del Factor k (Correlación para S'c)
+        k_modo = st.radio("Definición del factor k (S'c = k * √f'c):", 
+                          ["Valores Recomendados (Memoria)", "Ingreso Manual"], horizontal=True)
+        
+        if k_modo == "Valores Recomendados (Memoria)":
+            tipo_pav = st.selectbox("Tipo de Pavimento:", 
+                                     ["Autopistas/Carreteras (k=10.8)", 
+                                      "Zonas Industriales (k=10.1)", 
+                                      "Urbanos Secundarios (k=9.4)",
+                                      "Subestaciones / Estándar (k=8.0)"])
+            
+            k_final = MAPA_K_SC[tipo_pav]
+        else:
+            k_final = st.number_input("Ingrese valor de k personalizado:", 7.0, 12.0, 8.0, step=0.1)
+        # 2. Resistencia a la Compresión
+        fc_kg = st.selectbox("Resistencia f'c (kg/cm²)", [210, 245, 280, 315, 350], index=2)
+        fc_psi = fc_kg * 14.2233
+        # 3. Cálculos Finales
+        sc = k_final * math.sqrt(fc_psi)
+        ec = 57000 * math.sqrt(fc_psi)
+        # 4. Visualización de Resultados
+        st.success(f"**Módulo de Ruptura (S'c):** {sc:.2f} psi")
+        st.info(f"**Módulo de Elasticidad (Ec):** {ec:,.0f} psi")
+        
+        st.markdown(f"""
+        <div style="background-color: #f0f2f6; padding: 10px; border-radius: 5px;">
+            <small><b>Fórmulas aplicadas:</b><br>
+            S'c = {k_final} × √f'c (psi)<br>
+            Ec = 57000 × √f'c (psi)</small>
+        </div>
+        """, unsafe_allow_html=True)
+    with col2:
+        st.subheader("🌍 Soporte del Suelo (Sistema Multicapa)")
+        
+        # --- SECCIÓN 1: SUELO NATURAL ---
+        st.markdown("#### 1. Subrasante Natural")
+        
+        # Selector de método para k
+        metodo_k = st.radio(
+            "Método para definir k natural:",
+            ["Correlación AASHTO (CBR)", "Ensayo de Placa de Carga (Manual)"],
+            horizontal=True
+        )
+        
+        if metodo_k == "Correlación AASHTO (CBR)":
+            cbr = st.number_input("CBR de la Subrasante (%)", 1.0, 100.0, 3.0, step=0.5, help="Valor de soporte del suelo natural")
+            
+            # Fórmula de correlación técnica (memoizada)
+            k_natural = k_desde_cbr(cbr)
+            
+            st.caption(f"Valor k natural calculado: **{k_natural:.1f} pci**")
+            
+            # --- NOTAS RECUPERADAS ---
+            st.warning("⚠️ **Aviso Técnico:** La correlación CBR–k es una aproximación teórica. Se recomienda validar con **placa de carga**.")
+            
+            with st.expander("📝 Ver justificación metodológica"):
+                st.info("""
+                **Criterio de Diseño:** Se utiliza la correlación matemática CBR–k expresada en pci para mantener la coherencia con el modelo empírico de la AASHTO '93. 
+                
+                Gráficos referenciales (como la Fig. 1 de la norma) suelen sobreestimar la capacidad de soporte en subrasantes naturales al no considerar el confinamiento real de la losa. Para un diseño estructural seguro, se prioriza la consistencia con el *AASHTO Road Test*.
+                """)
+            # --------------------------
+        
+        else:
+            # Opción manual (Ensayo de Placa)
+            col_k1, col_k2 = st.columns(2)
+            with col_k1:
+                k_manual_mpa = st.number_input("k del Ensayo (MPa/m)", 10.0, 150.0, 40.0)
+            with col_k2:
+                k_natural = k_manual_mpa * 3.684
+                st.metric("k Natural (pci)", f"{k_natural:.1f}")
+            
+            st.success("✅ Usando valor real de ensayo de placa.")
+
+        # --- SECCIÓN 2: MEJORAMIENTO / SUB-BASE ---
+        st.divider()
+        st.markdown("#### 2. Mejoramiento / Sub-base")
+        st.caption("El uso de una base incrementa el valor de reacción (k combinado).")
+        
+        usar_base = st.checkbox("¿Incluir capa de Base/Mejoramiento?", value=True)
+        
+        if usar_base:
+            c_b1, c_b2 = st.columns(2)
+            with c_b1:
+                tipo_base = st.selectbox("Material de Base:", ["Base Granular (Zahorra)", "Suelo Cemento / Estabilizada"])
+            with c_b2:
+                esp_base = st.number_input("Espesor Base (cm):", 10.0, 60.0, 15.0, step=5.0)
+            
+            # Calculamos el k combinado usando la función nueva
+            k_diseno = calcular_k_combinado(k_natural, esp_base, tipo_base)
+            
+            # Cálculo del porcentaje de mejora para mostrarlo visualmente
+            mejora_pct = ((k_diseno - k_natural) / k_natural) * 100
+            
+            st.metric("Módulo k Combinado (Diseño)", f"{k_diseno:.1f} pci", delta=f"+{mejora_pct:.0f}% Incremento")
+            
+            if tipo_base == "Suelo Cemento / Estabilizada" and esp_base < 15:
+                st.warning("⚠️ Recomendación: Para bases estabilizadas use espesores ≥ 15 cm.")
+                
+        else:
+            # Si no hay base, el k de diseño es el natural
+            k_diseno = k_natural
+            st.metric("Módulo k de Diseño", f"{k_diseno:.1f} pci")
+            st.info("Diseño directo sobre subrasante natural (No recomendado para cargas altas).")
+
+        # Asignamos la variable final 'k_val' que usa el resto del programa
+        k_val = k_diseno
+        st.subheader("🔗 Transferencia de Carga (J)")
+        
+        j_manual = st.toggle("Ingresar J manualmente", False)
+
+        if j_manual:
+            j_val = st.number_input("Valor J personalizado", 2.0, 5.0, 3.2, step=0.1)
+            st.info(f"Valor J manual activo: **{j_val}**")
+            tiene_dovelas = "No"  # Valor por defecto seguro
+            tiene_soporte = "No"  # Valor por defecto seguro
+        else:
+            seleccion = st.radio("Seleccione escenario:", list(ESCENARIOS_J.keys()))
+            datos_esc = ESCENARIOS_J[seleccion]
+            j_val = datos_esc["valor"]
+            # --- CORRECCIÓN: Definir las variables aquí ---
+            tiene_dovelas = datos_esc["dovelas"]
+            tiene_soporte = datos_esc["soporte"]
+            st.write(f"**Sustento:** {datos_esc['sustento']}")
+
+            if datos_esc["nota_bordillo"]:
+                st.warning("⚠️ **Nota sobre el Bordillo:** Para ser efectivo, debe ser integral (vaciado monolítico) o anclado con barras de amarre. Si es sobrepuesto, no aporta soporte lateral.")
+
+            st.info(f"Valor J: **{j_val}**")
+
+        st.subheader("💧 Coeficiente de Drenaje (Cd)")
+        
+        st.markdown("Responda las siguientes preguntas para estimar el valor Cd:")
+        
+        col_d1, col_d2 = st.columns(2)
+        
+        with col_d1:
+            st.markdown("**1. Velocidad de Drenaje:**")
+            st.caption("Si el pavimento se inunda, ¿qué tan rápido desaparece el agua?")
+            calidad_input = st.selectbox("Seleccione velocidad:", [
+                "Excelente (2 horas)",
+                "Bueno (1 día)",
+                "Regular (1 semana)",
+                "Pobre (1 mes)",
+                "Muy Pobre (Nunca)"
+            ])
+            
+            # Convertimos texto a índice (0 a 4)
+            idx_calidad = MAPA_CALIDAD_DRENAJE[calidad_input]
+
+        with col_d2:
+            st.markdown("**2. Clima y Saturación:**")
+            st.caption("¿Con qué frecuencia llueve o el suelo está saturado de agua?")
+            exposicion_input = st.selectbox("Seleccione condición climática:", [
+                "Seco / Árido (< 1% del tiempo)",
+                "Moderado / Estándar (1% - 5% del tiempo)",
+                "Húmedo / Lluvioso (5% - 25% del tiempo)",
+                "Saturación Constante (> 25% del tiempo)"
+            ])
+            
+            # Convertimos texto a índice (0 a 3)
+            idx_exposicion = MAPA_EXPOSICION_DRENAJE[exposicion_input]
+
+        # Obtenemos el valor recomendado automáticamente
+        cd_recomendado = MATRIZ_CD[idx_calidad][idx_exposicion]
+        
+        st.write("---")
+        # Permitimos que el usuario lo edite si quiere, pero por defecto ponemos el calculado
+        cd_val = st.number_input(f"Valor Cd Recomendado: {cd_recomendado}", 0.50, 1.40, cd_recomendado, step=0.01)
+        
+        # Mensajes de feedback visual
+        if cd_val < 1.0:
+            st.error(f"📉 Drenaje Lento (Cd={cd_val}). El agua atrapada debilitará la base, requiriendo mayor espesor de concreto.")
+        elif cd_val > 1.0:
+            st.success(f"📈 Buen Drenaje (Cd={cd_val}). El agua fluye rápido, permitiendo optimizar el espesor.")
+        else:
+            st.info("Drenaje Estándar (Cd = 1.0).")
+            
+    st.divider()
+    if st.button("🚀 CALCULAR ESTRUCTURA"):
+        # Arranque en caliente: el resultado del cálculo anterior (si existe)
+        # suele estar a un par de iteraciones del nuevo
+        esp_pulg = calcular_espesor_aashto(w18_total, zr, s0, p0, pt, sc, cd_val, j_val, ec, k_val,
+                                           x0_hint=st.session_state.get('esp_pulg_base', 10.0))
+        
+        if esp_pulg:
+            esp_exacto_cm = esp_pulg * 2.54
+            esp_comercial_cm = np.ceil(esp_exacto_cm) 
+            esp_final_cm = max(esp_comercial_cm, 15.0)
+            
+            # Guardamos variables en Session State
+            st.session_state['esp_final_cm'] = esp_final_cm
+            st.session_state['esp_pulg_base'] = esp_pulg
+            st.session_state['ec_res'] = ec
+            st.session_state['k_res'] = k_val
+            st.session_state['w18_res'] = w18_total
+            st.session_state['conf_res'] = conf
+            st.session_state['tiene_dovelas'] = tiene_dovelas
+            st.session_state['tiene_soporte'] = tiene_soporte
+            
+            # --- NUEVO: GUARDAR CONFIGURACIÓN DE SUB-BASE ---
+            st.session_state['usar_base'] = usar_base
+            if usar_base:
+                st.session_state['tipo_base_guardado'] = tipo_base
+                st.session_state['esp_base_guardado'] = esp_base
+            else:
+                st.session_state['tipo_base_guardado'] = ""
+                st.session_state['esp_base_guardado'] = 0
+                
+            st.toast("✅ Cálculo realizado y datos guardados correctamente.")
+            st.success(f"### Espesor de Losa Recomendado: {esp_final_cm:.1f} cm")
+            st.info(f"*(Valor exacto AASHTO: {esp_exacto_cm:.2f} cm | k diseño: {k_val:.1f} pci)*")
+
+with tab3:
+    st.header("📐 Recomendaciones Geométricas")
+    
+    # Cambiamos la validación al nuevo nombre de variable
+    if 'esp_final_cm' not in st.session_state:
+        st.info("⚠️ Realice el cálculo en la pestaña 'Parámetros de Diseño' para habilitar esta sección.")
+    else:
+        st.warning("⚠️ **Tránsito Excéntrico:** En subestaciones, el tránsito suele circular cerca del borde. Se recomienda considerar bordes engrosados +25% del espesor en perímetros.")
+        
+        col_g1, col_g2 = st.columns(2)
+        with col_g1:
+            ancho_carril = st.number_input("Ancho total de carril (m)", 2.5, 7.0, 4.5, step=0.1)
+            num_juntas_long = 1 if ancho_carril > 4.5 else 0
+            ancho_losa = ancho_carril / (num_juntas_long + 1)
+            st.metric("Ancho de Losa Efectivo (B)", f"{ancho_losa:.2f} m")
+        
+        with col_g2:
+            # Recuperamos el espesor en pulgadas original para la fórmula del radio de rigidez (l)
+            # La fórmula técnica del radio de rigidez RELATIVA (ℓ) requiere unidades en pulgadas
+            esp_pulg_calculo = st.session_state['esp_pulg_base']
+            nu = 0.15 
+            
+            # Radio de rigidez relativa (ℓ) en pulgadas
+            l_pulg = ((st.session_state['ec_res'] * (esp_pulg_calculo**3)) / (12 * (1 - nu**2) * st.session_state['k_res']))**0.25
+            
+            # Límite de rigidez (21 veces l) convertido a metros
+            limit_rigidez = (21 * l_pulg) * 0.0254
+            
+            # Largo sugerido (L) redondeado a múltiplos de 0.5m
+            largo_sug = round((min(ancho_losa * 1.25, limit_rigidez, 5.0)) * 2) / 2
+            st.metric("Largo Sugerido de Losa (L)", f"{largo_sug} m")
+            st.write("📌 **Corte de juntas:** Aserrado temprano (4–12 h después del vaciado).")
+
+        st.divider()
+        st.subheader("🔍 Verificaciones Técnicas")
+        c_v1, c_v2 = st.columns(2)
+        with c_v1:
+            relacion_lb = largo_sug / ancho_losa
+            st.write(f"**1. Relación de Aspecto (L/B):** {relacion_lb:.2f}")
+            if relacion_lb <= 1.25: st.success("✅ Relación ideal (≤ 1.25).")
+            elif relacion_lb <= 1.5: st.warning("⚠️ Relación aceptable (1.25 - 1.50).")
+            else: st.error("🚨 Relación crítica (> 1.50).")
+
+        with c_v2:
+            st.write(f"**2. Radio de Rigidez Relativa (ℓ):** {l_pulg:.2f} pulg")
+            st.write(f"**3. Espaciamiento Máximo (21ℓ):** {limit_rigidez:.2f} m")
+            if largo_sug <= limit_rigidez: st.success("✅ Cumple límite de rigidez.")
+            else: st.error("🚨 Excede límite de rigidez.")
+
+        st.divider()
+        st.subheader("📝 Resumen de Memoria Técnica")
+        resumen_texto = f"""
+        El pavimento rígido fue diseñado para un tránsito acumulado de {st.session_state['w18_res']:,.0f} ESALs, 
+        con una confiabilidad del {st.session_state['conf_res']}%. 
+        
+        **Espesor Adoptado:** {st.session_state['esp_final_cm']:.1f} cm. 
+        La modulación propuesta ({ancho_losa:.2f} m x {largo_sug:.2f} m) cumple criterios técnicos de rigidez. 
+        """
+        st.info(resumen_texto)
+
+    st.markdown("---")
+    st.markdown("<p style='color: gray; font-size: 0.8em;'>Nota: El ancho de carril define la geometría constructiva; no es una variable de entrada estructural en la ecuación de la metodología AASHTO 93.</p>", unsafe_allow_html=True)
+    st.divider()
+    st.subheader("🔩 Diseño de Acero (Dovelas y Amarre)")
+   
+    if 'esp_final_cm' not in st.session_state:
+        st.info("⚠️ Realice el cálculo en la pestaña 'Parámetros de Diseño' para ver el acero.")
+    else:
+        D = st.session_state['esp_final_cm']
+        
+        # Recuperamos variables del Escenario (Tab 2)
+        st_dovelas = st.session_state.get('tiene_dovelas', "No")
+        st_soporte = st.session_state.get('tiene_soporte', "No")
+        
+        # Recuperamos la Geometría actual calculada arriba en este mismo Tab 3
+        # Si num_juntas_long es 1, significa que hay 2 losas (Junta central).
+        # Si num_juntas_long es 0, es una sola losa ancha.
+        es_doble_losa = (num_juntas_long > 0)
+
+        # ------------------------------------------
+        # 1. CÁLCULO DE PASADORES (DOVELAS)
+        # ------------------------------------------
+        if st_dovelas == "No":
+            dov_info = "🚫 No requiere (Según escenario seleccionado: Sin Dovelas)."
+            dov_check = False
+        else:
+            # Si el escenario TIENE dovelas, calculamos dimensiones
+            dov_check = True
+            if D < 15:
+                dov_info = "Espesor muy bajo (<15cm) para dovelas estándar."
+            elif D < 20:
+                dov_info = "Ø 3/4\" (19mm) | Largo: 40 cm | Separación: 30 cm"
+            elif D < 25:
+                dov_info = "Ø 1\" (25mm) | Largo: 45 cm | Separación: 30 cm"
+            elif D < 30:
+                dov_info = "Ø 1 1/4\" (32mm) | Largo: 50 cm | Separación: 30 cm"
+            else:
+                dov_info = "Ø 1 1/2\" (38mm) | Largo: 50 cm | Separación: 30 cm"
+
+        # ------------------------------------------
+        # 2. CÁLCULO DE BARRAS DE AMARRE
+        # ------------------------------------------
+        # Definimos las especificaciones técnicas según espesor primero
+        if D < 20:
+            specs_amarre = "Ø 1/2\" (12mm) | Largo: 60 cm | Sep: 75 cm"
+        elif D < 25:
+            specs_amarre = "Ø 1/2\" (12mm) | Largo: 70 cm | Sep: 65 cm"
+        else:
+            specs_amarre = "Ø 5/8\" (16mm) | Largo: 80 cm | Sep: 60 cm"
+
+        # Determinamos QUÉ tipo de amarre mostrar según tu lógica
+        lista_amarres = []
+        
+        # A. Amarre entre losas (Longitudinal central)
+        if es_doble_losa:
+            lista_amarres.append("Entre Losas (Central)")
+        
+        # B. Amarre con Bordillo (Borde)
+        if st_soporte == "Sí":
+            lista_amarres.append("Losa-Bordillo (Borde)")
+
+        # Generamos el texto final
+        if not lista_amarres:
+            ama_info = "🚫 No requiere acero de amarre."
+            ama_nota = "Caso: Una sola losa de ancho completo y sin bordillo anclado (Escenario sin soporte)."
+            ama_check = False
+        else:
+            ubicacion = " + ".join(lista_amarres)
+            ama_info = f"**Ubicación:** {ubicacion}\n\n**Acero:** {specs_amarre}"
+            ama_nota = "Barras corrugadas de acero grado 60."
+            ama_check = True
+
+        # ------------------------------------------
+        # VISUALIZACIÓN
+        # ------------------------------------------
+        col_a1, col_a2 = st.columns(2)
+        
+        with col_a1:
+            st.markdown("#### 🚀 Pasadores (Dovelas)")
+            st.caption("Transferencia de carga en juntas transversales")
+            if dov_check:
+                st.success(dov_info)
+            else:
+                st.info(dov_info)
+        
+        with col_a2:
+            st.markdown("#### 🔗 Barras de Amarre")
+            st.caption("Anclaje en juntas longitudinales")
+            if ama_check:
+                st.success(ama_info)
+                st.caption(f"📝 {ama_nota}")
+            else:
+                st.info(f"{ama_info}\n\n*{ama_nota}*")
+with tab4:
+    st.header("📊 Ábaco de Sensibilidad: Espesor vs CBR")
+    
+    st.markdown("""
+    ### ¿Qué es el ábaco de diseño?
+    Permite evaluar la sensibilidad del espesor frente a variaciones del **CBR del suelo natural**.
+    *Nota: Si configuraste una Sub-base en la pestaña anterior, el cálculo considera el aporte estructural de esa capa sobre cada CBR evaluado.*
+    *El límite máximo de diseño recomendado para subestaciones es de **25 cm**.*
+    """)
+
+    if 'w18_res' not in st.session_state:
+        st.info("💡 Por favor, realice el cálculo en la pestaña **'🧱 Parámetros de Diseño'**.")
+    else:
+        # El formulario evita un rerun completo del script por cada tecla en
+        # los campos del rango: el barrido solo se dispara al enviar.
+        with st.form("abaco_form"):
+            c1, c2, c3 = st.columns(3)
+            with c1: cbr_ini = st.number_input("CBR Inicial (%)", 1.0, 50.0, 3.0, key="aba_cbr_ini")
+            with c2: cbr_fin = st.number_input("CBR Final (%)", 5.0, 100.0, 20.0, key="aba_cbr_fin")
+            with c3: cbr_inc = st.number_input("Incremento (%)", 0.5, 5.0, 5.0, key="aba_cbr_inc")
+            generar_abaco = st.form_submit_button("📊 Generar Ábaco")
+
+        # Recuperar configuración de la base
+        usa_base_sim = st.session_state.get('usar_base', False)
+        tipo_base_sim = st.session_state.get('tipo_base_guardado', "")
+        esp_base_sim = st.session_state.get('esp_base_guardado', 0)
+
+        # Clave de entradas del ábaco: si cambió algún parámetro aguas arriba
+        # desde el último barrido, se regenera en vez de mostrar datos viejos
+        # (construir_abaco está cacheada, así que el caso repetido es gratis).
+        clave_abaco = (st.session_state['w18_res'], zr, s0, p0, pt, sc, cd_val, j_val,
+                       st.session_state['ec_res'], cbr_ini, cbr_fin, cbr_inc,
+                       usa_base_sim, tipo_base_sim, esp_base_sim)
+        clave_previa = st.session_state.get('abaco_clave')
+
+        if generar_abaco or (clave_previa is not None and clave_previa != clave_abaco):
+            st.session_state['abaco_resultado'] = construir_abaco(*clave_abaco)
+            st.session_state['abaco_clave'] = clave_abaco
+
+        df, df_graf, fuera_de_rango, alerta_detectada = st.session_state.get(
+            'abaco_resultado', (None, None, False, False))
+
+        if df is None and not generar_abaco:
+            st.info("💡 Defina el rango de CBR y pulse **'📊 Generar Ábaco'**.")
+
+        if df is not None:
+            st.subheader("📋 Tabla de Sensibilidad (Considerando Estructura de Base)")
+            # st.dataframe virtualiza las filas: no serializa toda la tabla
+            # a HTML en cada rerun como hacía st.table
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            
+            # --- NOTAS DE ADVERTENCIA RECUPERADAS ---
+            if alerta_detectada:
+                st.warning("""
+                🚨 **ALERTA DE OPTIMIZACIÓN TÉCNICA (Espesor > 23 cm):**
+                Para espesores superiores a 23-25 cm, la metodología AASHTO indica que el diseño se vuelve poco eficiente. 
+                
+                **Recomendaciones antes de aumentar el espesor:**
+                1. **Mejorar la Sub-base:** En lugar de una losa más gruesa, considere una sub-base tratada con cemento para elevar el valor de 'k'.
+                2. **Revisar Transferencia de Carga:** Verifique si el uso de dovelas de mayor diámetro puede optimizar el coeficiente 'J'.
+                3. **Resistencia del Concreto:** Evalúe subir el f'c a 280 o 315 kg/cm² para mejorar el Módulo de Ruptura (S'c).
+                """)
+            
+            if fuera_de_rango:
+                st.error("⚠️ **LÍMITE EXCEDIDO:** El espesor calculado supera los 25 cm.")
+                st.warning("""
+                **🔍 Recomendaciones de Optimización:**
+                Cuando el espesor calculado resulta tan elevado (ej. > 25 cm), la AASHTO '93 sugiere que el diseño debe optimizarse mediante:
+                
+                1. **Mejorar el Valor k:** No diseñe sobre la subrasante natural. Considere una sub-base granular o estabilizada con cemento para alcanzar valores de k cercanos a 250 pci.
+                2. **Incrementar Resistencia (f'c):** Use un concreto de mayor desempeño (f'c 280 o 315 kg/cm²).
+                3. **Verificar Tránsito:** Revise si el número de repeticiones del eje pesado es realista para una subestación.
+                """)
+
+            st.subheader("📈 Curva de Sensibilidad del Espesor")
+            st.line_chart(df_graf)
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+